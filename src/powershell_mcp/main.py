@@ -7,16 +7,12 @@ A Model Context Protocol server for executing PowerShell commands using pyautogu
 import asyncio
 import sys
 import logging
-import pyautogui
 
 from powershell_mcp.powershell_server import PowerShellMCPServer
 
-# Configure pyautogui
-pyautogui.FAILSAFE = True
-pyautogui.PAUSE = 0.1
-
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+# Setup logging (only once, library modules never attach handlers themselves)
+if not logging.getLogger().handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 
@@ -29,7 +25,7 @@ def main():
     except KeyboardInterrupt:
         logger.info("Server stopped by user (Ctrl+C)")
     except Exception as e:
-        logger.error(f"Server error: {e}")
+        logger.error("Server error: %s", e)
         sys.exit(1)
 
 
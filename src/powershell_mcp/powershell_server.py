@@ -1,29 +1,94 @@
 import asyncio
+import io
 import json
+import select
 import sys
+import threading
 import time
 import logging
 import os
 from dataclasses import dataclass
-from typing import Dict, Any, Optional
-import pyperclip
+import fastjsonschema
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional, Set, Tuple, Union
+from powershell_mcp.win32_clipboard import paste_text
 from powershell_mcp.windows_terminal_controller import WindowsTerminalController
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+if TYPE_CHECKING:
+    from PIL import Image
+
+try:
+    import orjson
+
+    # orjson rejects lone UTF-16 surrogates, which clipboard text can contain; the stdlib encoder escapes them
+    def _dumps_pretty(obj: Any) -> str:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+        except orjson.JSONEncodeError:
+            return json.dumps(obj, indent=2)
+
+    def _dumps_bytes(obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            return json.dumps(obj, separators=(",", ":")).encode()
+
+    def _loads(data: bytes) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson also rejects escaped lone surrogates such as "\ud800", which the stdlib accepts;
+            # genuinely malformed input raises json.JSONDecodeError from here as before
+            return json.loads(data)
+
+except ImportError:  # fall back to the stdlib encoder when orjson is not installed
+
+    def _dumps_pretty(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+
+    def _dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def _loads(data: bytes) -> Any:
+        return json.loads(data)
+
+
 logger = logging.getLogger(__name__)
 
 # Constants
 DEFAULT_TIMEOUT = 30
-DEFAULT_RETRY_ATTEMPTS = 10
-DEFAULT_RETRY_DELAY = 0.5
+TERMINAL_READY_TIMEOUT = 5
+INITIAL_RETRY_DELAY = 0.05
+MAX_RETRY_DELAY = 0.5
+RETRY_BACKOFF_FACTOR = 1.7
 MULTILINE_EXECUTION_DELAY = 2
 SINGLELINE_EXECUTION_DELAY = 1
+STDIN_READ_LIMIT = 16 * 1024 * 1024
+STDOUT_RETRY_DELAY = 0.01
+MAX_CONCURRENT_REQUESTS = 4
 PROTOCOL_VERSION = "2024-11-05"
 SERVER_VERSION = "1.1.0"
+SCREENSHOT_FORMATS = ("png", "jpeg")
+DEFAULT_SCREENSHOT_FORMAT = "png"
+DEFAULT_PNG_COMPRESS_LEVEL = 1
+JPEG_QUALITY = 85
+MAX_CLIPBOARD_LENGTH = 4 * 1024 * 1024
+
+# Tools whose results are returned compact rather than pretty-printed (payloads can be large)
+COMPACT_RESULT_TOOLS = frozenset({"get_clipboard"})
 
+# Tools already serialized by the terminal lock; they don't take a request permit while queued on it
+TERMINAL_LOCKED_TOOLS = frozenset({"execute_pwsh_script"})
 
-@dataclass
+# Pre-encoded JSON-RPC envelopes; ids, results and messages are substituted as JSON bytes
+_RESULT_RESPONSE_TEMPLATE = b'{"jsonrpc":"2.0","id":%s,"result":%s}'
+_ERROR_RESPONSE_TEMPLATE = b'{"jsonrpc":"2.0","id":%s,"error":{"code":%d,"message":%s}}'
+_PARSE_ERROR_RESPONSE = _ERROR_RESPONSE_TEMPLATE % (b"1", -32700, b'"Parse error"')
+
+# A response is either a dict or an already serialized JSON-RPC frame
+Response = Union[Dict[str, Any], bytes]
+
+
+@dataclass(slots=True)
 class ToolResult:
     """Standardized tool execution result"""
 
@@ -64,8 +129,51 @@ class PowerShellMCPServer:
     def __init__(self, timeout: int = DEFAULT_TIMEOUT):
         self.terminal_controller = WindowsTerminalController(timeout=timeout)
         self.tools = self._define_tools()
+        # Compile schemas into specialized validators once; defaults are applied by the tool handlers
+        self._validators = {
+            name: fastjsonschema.compile(tool["inputSchema"], use_default=False) for name, tool in self.tools.items()
+        }
         self.default_timeout = timeout
-        logger.info(f"PowerShell MCP Server initialized with timeout: {timeout}s")
+        self._write_lock = asyncio.Lock()
+        self._request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        self._stdout_fd = 1  # resolved from sys.stdout when the server starts
+        self._stdin_fd = 0  # resolved from sys.stdin when the server starts
+        self._stdin_threaded = False
+        self._terminal_lock = asyncio.Lock()
+
+        # Resolve the screenshot directory once; directories are created on first save and remembered
+        self._temp_dir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "temp"))
+        self._known_dirs: Set[str] = set()
+
+        # Static results are serialized once instead of on every request
+        self._initialize_result = _dumps_bytes(
+            {
+                "protocolVersion": PROTOCOL_VERSION,
+                "capabilities": {"tools": {}},
+                "serverInfo": {"name": "powershell-mcp-server", "version": SERVER_VERSION},
+            }
+        )
+        self._tools_list_result = _dumps_bytes({"tools": list(self.tools.values())})
+
+        # Dispatch tables for JSON-RPC methods and tool calls
+        self._method_handlers: Dict[str, Callable[[Any, Dict[str, Any]], Awaitable[Response]]] = {
+            "initialize": self._handle_initialize,
+            "tools/list": self._handle_tools_list,
+            "tools/call": self._handle_tools_call,
+        }
+        self._tool_handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = {
+            "execute_pwsh_script": lambda arguments: self.execute_pwsh_script(
+                arguments.get("script", ""), arguments.get("timeout", self.default_timeout)
+            ),
+            "get_clipboard": lambda arguments: self.get_clipboard(),
+            "capture_pwsh_response": lambda arguments: self.capture_pwsh_response(
+                arguments.get("save_path"),
+                arguments.get("exclude_titlebar", True),
+                arguments.get("image_format", DEFAULT_SCREENSHOT_FORMAT),
+                arguments.get("compress_level", DEFAULT_PNG_COMPRESS_LEVEL),
+            ),
+        }
+        logger.info("PowerShell MCP Server initialized with timeout: %ss", timeout)
 
     def _define_tools(self) -> Dict[str, Dict[str, Any]]:
         """Define all available tools with comprehensive schemas"""
@@ -80,6 +188,7 @@ class PowerShellMCPServer:
                             "type": "string",
                             "description": "PowerShell script to execute (single-line or multi-line)",
                             "minLength": 1,
+                            "pattern": "\\S",
                         },
                         "timeout": {
                             "type": "integer",
@@ -106,59 +215,65 @@ class PowerShellMCPServer:
                 "inputSchema": {
                     "type": "object",
                     "properties": {
-                        "save_path": {"type": "string", "description": "Optional path to save screenshot", "default": None},
+                        "save_path": {
+                            "type": ["string", "null"],
+                            "description": "Optional path to save screenshot",
+                            "default": None,
+                        },
                         "exclude_titlebar": {
                             "type": "boolean",
                             "description": "Exclude window title bar from capture (default: true)",
                             "default": True,
                         },
+                        "image_format": {
+                            "type": "string",
+                            "description": f"Image format: 'png' (lossless) or 'jpeg' (faster, smaller) (default: {DEFAULT_SCREENSHOT_FORMAT})",  # noqa: E501
+                            "enum": list(SCREENSHOT_FORMATS),
+                            "default": DEFAULT_SCREENSHOT_FORMAT,
+                        },
+                        "compress_level": {
+                            "type": "integer",
+                            "description": f"PNG compression level, 0 (fastest) to 9 (smallest) (default: {DEFAULT_PNG_COMPRESS_LEVEL})",  # noqa: E501
+                            "default": DEFAULT_PNG_COMPRESS_LEVEL,
+                            "minimum": 0,
+                            "maximum": 9,
+                        },
                     },
                 },
             },
         }
 
-    async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+    async def handle_request(self, request: Dict[str, Any]) -> Response:
         """Handle incoming MCP requests"""
         try:
             method = request.get("method")
             params = request.get("params", {})
             request_id = request.get("id", 1)
 
-            logger.debug(f"Handling request: {method}")
+            logger.debug("Handling request: %s", method)
 
-            if method == "initialize":
-                return self._handle_initialize(request_id)
-            elif method == "tools/list":
-                return self._handle_tools_list(request_id)
-            elif method == "tools/call":
-                return await self._handle_tools_call(request_id, params)
-            else:
+            handler = self._method_handlers.get(method)
+            if handler is None:
                 return self._create_error_response(request_id, -32601, f"Unknown method: {method}")
 
+            return await handler(request_id, params)
+
         except Exception as e:
-            logger.error(f"Error handling request: {e}")
+            logger.error("Error handling request: %s", e)
             error_id = request.get("id", 1)
             return self._create_error_response(error_id, -32603, str(e))
 
-    def _handle_initialize(self, request_id: int) -> Dict[str, Any]:
+    async def _handle_initialize(self, request_id: int, params: Dict[str, Any]) -> bytes:
         """Handle initialize request"""
         logger.info("Handling initialize request")
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "result": {
-                "protocolVersion": PROTOCOL_VERSION,
-                "capabilities": {"tools": {}},
-                "serverInfo": {"name": "powershell-mcp-server", "version": SERVER_VERSION},
-            },
-        }
+        return _RESULT_RESPONSE_TEMPLATE % (_dumps_bytes(request_id), self._initialize_result)
 
-    def _handle_tools_list(self, request_id: int) -> Dict[str, Any]:
+    async def _handle_tools_list(self, request_id: int, params: Dict[str, Any]) -> bytes:
         """Handle tools list request"""
-        logger.debug(f"Listing {len(self.tools)} available tools")
-        return {"jsonrpc": "2.0", "id": request_id, "result": {"tools": list(self.tools.values())}}
+        logger.debug("Listing %s available tools", len(self.tools))
+        return _RESULT_RESPONSE_TEMPLATE % (_dumps_bytes(request_id), self._tools_list_result)
 
-    async def _handle_tools_call(self, request_id: int, params: Dict[str, Any]) -> Dict[str, Any]:
+    async def _handle_tools_call(self, request_id: int, params: Dict[str, Any]) -> Response:
         """Handle tools call request with improved error handling"""
         tool_name = params.get("name")
         arguments = params.get("arguments", {})
@@ -169,7 +284,8 @@ class PowerShellMCPServer:
         if tool_name not in self.tools:
             return self._create_error_response(request_id, -32601, f"Unknown tool: {tool_name}")
 
-        logger.info(f"Executing tool: {tool_name} with arguments: {list(arguments.keys())}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Executing tool: %s with arguments: %s", tool_name, list(arguments.keys()))
 
         try:
             # Validate arguments based on tool schema
@@ -178,58 +294,43 @@ class PowerShellMCPServer:
                 return self._create_error_response(request_id, -32602, validation_error)
 
             # Execute the appropriate tool
-            if tool_name == "execute_pwsh_script":
-                result = await self.execute_pwsh_script(
-                    arguments.get("script", ""), arguments.get("timeout", self.default_timeout)
-                )
-            elif tool_name == "get_clipboard":
-                result = await self.get_clipboard()
-            elif tool_name == "capture_pwsh_response":
-                result = await self.capture_pwsh_response(arguments.get("save_path"), arguments.get("exclude_titlebar", True))
-            else:
+            tool_handler = self._tool_handlers.get(tool_name)
+            if tool_handler is None:
                 return self._create_error_response(request_id, -32601, f"Tool not implemented: {tool_name}")
 
-            logger.info(f"Tool {tool_name} executed successfully: {result.get('success', False)}")
+            if tool_name in TERMINAL_LOCKED_TOOLS:
+                result = await tool_handler(arguments)
+            else:
+                async with self._request_semaphore:
+                    result = await tool_handler(arguments)
+
+            logger.debug("Tool %s executed successfully: %s", tool_name, result.get("success", False))
+            text = _dumps_bytes(result).decode() if tool_name in COMPACT_RESULT_TOOLS else _dumps_pretty(result)
             return {
                 "jsonrpc": "2.0",
                 "id": request_id,
-                "result": {"content": [{"type": "text", "text": json.dumps(result, indent=2)}]},
+                "result": {"content": [{"type": "text", "text": text}]},
             }
 
         except PowerShellMCPError as e:
-            logger.error(f"PowerShell MCP error in tool {tool_name}: {e}")
+            logger.error("PowerShell MCP error in tool %s: %s", tool_name, e)
             return self._create_error_response(request_id, -32603, str(e))
         except Exception as e:
-            logger.error(f"Unexpected error executing tool {tool_name}: {e}", exc_info=True)
+            logger.error("Unexpected error executing tool %s: %s", tool_name, e, exc_info=True)
             return self._create_error_response(request_id, -32603, f"Tool execution failed: {str(e)}")
 
     def _validate_tool_arguments(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[str]:
         """Validate tool arguments against schema"""
-        tool_schema = self.tools.get(tool_name, {}).get("inputSchema", {})
-        required_fields = tool_schema.get("required", [])
-        properties = tool_schema.get("properties", {})  # noqa: F841
-
-        # Check required fields
-        for field in required_fields:
-            if field not in arguments:
-                return f"Missing required argument: {field}"
-
-        # Validate specific constraints
-        if tool_name == "execute_pwsh_script":
-            script = arguments.get("script", "")
-            if not script or not script.strip():
-                return "Script cannot be empty"
-
-            timeout = arguments.get("timeout", self.default_timeout)
-            if not isinstance(timeout, int) or timeout < 1 or timeout > 300:
-                return "Timeout must be an integer between 1 and 300 seconds"
-
-        return None
+        try:
+            self._validators[tool_name](arguments)
+            return None
+        except fastjsonschema.JsonSchemaException as e:
+            return str(e)
 
-    def _create_error_response(self, request_id: int, code: int, message: str) -> Dict[str, Any]:
+    def _create_error_response(self, request_id: int, code: int, message: str) -> bytes:
         """Create standardized error response"""
-        logger.warning(f"Creating error response - Code: {code}, Message: {message}")
-        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+        logger.warning("Creating error response - Code: %s, Message: %s", code, message)
+        return _ERROR_RESPONSE_TEMPLATE % (_dumps_bytes(request_id), code, _dumps_bytes(message))
 
     async def execute_pwsh_script(self, script: str, timeout: int = DEFAULT_TIMEOUT) -> Dict[str, Any]:
         """Execute PowerShell script by pasting into terminal with improved error handling"""
@@ -239,194 +340,322 @@ class PowerShellMCPServer:
                 raise ScriptExecutionError("Empty script provided")
 
             # Analyze script structure
-            lines = [line.strip() for line in script.split("\n") if line.strip()]
-            is_multiline = len(lines) > 1
+            # Single pass count of non-blank lines, without building stripped copies; only "\n" separates lines
+            lines_count = sum(1 for line in script.split("\n") if line and not line.isspace())
+            is_multiline = lines_count > 1
             script_type = "multi-line script" if is_multiline else "single command"
 
-            logger.info(f"Preparing to execute {script_type} with {len(lines)} line(s)")
+            logger.info("Preparing to execute %s with %s line(s)", script_type, lines_count)
 
-            # Ensure terminal availability
-            await self._ensure_terminal_available()
+            # The terminal is a single shared resource, so scripts must not interleave
+            async with self._terminal_lock:
+                # Ensure terminal availability
+                await self._ensure_terminal_available()
 
-            # Configure timeout
-            self.terminal_controller.timeout = timeout
+                # Configure timeout
+                self.terminal_controller.timeout = timeout
 
-            # Execute script
-            logger.info(f"Executing {script_type}...")
-            success = self.terminal_controller.paste_content(script, execute=True)
+                # Execute script
+                logger.info("Executing %s...", script_type)
+                success = self.terminal_controller.paste_content(script, execute=True)
 
-            if not success:
-                raise ScriptExecutionError(f"Failed to paste {script_type}")
+                if not success:
+                    raise ScriptExecutionError(f"Failed to paste {script_type}")
 
-            # Wait for execution to complete
-            execution_delay = MULTILINE_EXECUTION_DELAY if is_multiline else SINGLELINE_EXECUTION_DELAY
-            await asyncio.sleep(execution_delay)
+                # Wait for execution to complete
+                execution_delay = MULTILINE_EXECUTION_DELAY if is_multiline else SINGLELINE_EXECUTION_DELAY
+                await asyncio.sleep(execution_delay)
 
-            result = ToolResult(
-                success=True,
-                data={
-                    "lines_count": len(lines),
-                    "is_multiline": is_multiline,
-                    "script_type": script_type,
-                    "timeout_used": timeout,
-                    "message": f"{script_type.capitalize()} with {len(lines)} line{'s' if len(lines) != 1 else ''} executed successfully",  # noqa: E501
-                },
-            )
+            result: Dict[str, Any] = {
+                "success": True,
+                "lines_count": lines_count,
+                "is_multiline": is_multiline,
+                "script_type": script_type,
+                "timeout_used": timeout,
+                "message": f"{script_type.capitalize()} with {lines_count} line{'s' if lines_count != 1 else ''} executed successfully",  # noqa: E501
+            }
 
             logger.info("Script execution completed successfully")
-            return result.to_dict()
+            return result
 
         except PowerShellMCPError:
             raise
         except Exception as e:
-            logger.error(f"Unexpected error executing PowerShell script: {e}", exc_info=True)
+            logger.error("Unexpected error executing PowerShell script: %s", e, exc_info=True)
             raise ScriptExecutionError(f"Script execution failed: {str(e)}")
 
     async def _ensure_terminal_available(self) -> None:
         """Ensure terminal is running and available with retry logic"""
-        if self.terminal_controller.is_terminal_running() and self.terminal_controller.find_terminal_window():
-            if self.terminal_controller.focus_terminal():
-                return
+        # A visible terminal window implies a running terminal, no need for a separate process scan
+        if self.terminal_controller.focus_terminal() is not None:
+            return
 
         logger.info("Terminal not available, attempting to launch...")
         if not self.terminal_controller.launch_terminal():
             raise TerminalNotAvailableError("Failed to launch Windows Terminal")
 
-        # Retry logic for window availability
-        for attempt in range(DEFAULT_RETRY_ATTEMPTS):
-            if self.terminal_controller.find_terminal_window():
-                if self.terminal_controller.focus_terminal():
-                    logger.info(f"Terminal ready after {attempt + 1} attempt(s)")
-                    return
+        # Retry with exponential backoff, windows usually appear well before the deadline
+        delay = INITIAL_RETRY_DELAY
+        attempt = 0
+        deadline = time.monotonic() + TERMINAL_READY_TIMEOUT
+        while time.monotonic() < deadline:
+            attempt += 1
+            if self.terminal_controller.focus_terminal() is not None:
+                logger.info("Terminal ready after %s attempt(s)", attempt)
+                return
 
-            logger.debug(f"Terminal not ready, attempt {attempt + 1}/{DEFAULT_RETRY_ATTEMPTS}")
-            await asyncio.sleep(DEFAULT_RETRY_DELAY)
+            logger.debug("Terminal not ready, attempt %s, retrying in %.2fs", attempt, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * RETRY_BACKOFF_FACTOR, MAX_RETRY_DELAY)
 
-        raise TerminalNotAvailableError("Terminal window not available after multiple attempts")
+        raise TerminalNotAvailableError(f"Terminal window not available after {TERMINAL_READY_TIMEOUT}s")
 
     async def get_clipboard(self) -> Dict[str, Any]:
         """Get current clipboard content with enhanced error handling"""
         try:
-            clipboard_content = pyperclip.paste()
+            clipboard_content = await asyncio.to_thread(paste_text)
             content_length = len(clipboard_content)
 
-            logger.debug(f"Retrieved clipboard content: {content_length} characters")
-
-            result = ToolResult(
-                success=True,
-                data={
-                    "content": clipboard_content,
-                    "length": content_length,
-                    "is_empty": content_length == 0,
-                    "message": f"Clipboard content retrieved successfully ({content_length} characters)",
-                },
-            )
+            logger.debug("Retrieved clipboard content: %s characters", content_length)
+
+            # Cap very large clipboards, the content is copied several times while encoding the response
+            truncated = content_length > MAX_CLIPBOARD_LENGTH
+            if truncated:
+                clipboard_content = clipboard_content[:MAX_CLIPBOARD_LENGTH]
+                logger.warning("Clipboard content truncated from %s to %s characters", content_length, MAX_CLIPBOARD_LENGTH)
+
+            message = f"Clipboard content retrieved successfully ({content_length} characters)"
+            if truncated:
+                message += f", truncated to {MAX_CLIPBOARD_LENGTH} characters"
+
+            result: Dict[str, Any] = {
+                "success": True,
+                "content": clipboard_content,
+                "length": content_length,
+                "is_empty": content_length == 0,
+                "truncated": truncated,
+                "message": message,
+            }
 
-            return result.to_dict()
+            return result
 
         except Exception as e:
-            logger.error(f"Error getting clipboard content: {e}", exc_info=True)
+            logger.error("Error getting clipboard content: %s", e, exc_info=True)
             return ToolResult(success=False, error=f"Failed to get clipboard content: {str(e)}").to_dict()
 
-    async def capture_pwsh_response(self, save_path: Optional[str] = None, exclude_titlebar: bool = True) -> Dict[str, Any]:
+    async def capture_pwsh_response(
+        self,
+        save_path: Optional[str] = None,
+        exclude_titlebar: bool = True,
+        image_format: str = DEFAULT_SCREENSHOT_FORMAT,
+        compress_level: int = DEFAULT_PNG_COMPRESS_LEVEL,
+    ) -> Dict[str, Any]:
         """Capture terminal output with improved path handling and error reporting"""
         try:
-            logger.info(f"Capturing terminal output (exclude_titlebar: {exclude_titlebar})")
+            logger.info("Capturing terminal output (exclude_titlebar: %s, format: %s)", exclude_titlebar, image_format)
             screenshot = self.terminal_controller.capture_terminal_output(exclude_titlebar)
 
             if screenshot is None:
                 raise PowerShellMCPError("Failed to capture terminal window - window may not be visible or accessible")
 
             # Determine and validate save path
-            final_path = self._get_screenshot_path(save_path)
-
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(final_path), exist_ok=True)
-
-            # Save screenshot
-            screenshot.save(final_path)
-            file_size = os.path.getsize(final_path)
-
-            logger.info(f"Screenshot saved: {final_path} ({file_size} bytes)")
-
-            result = ToolResult(
-                success=True,
-                data={
-                    "saved_to": final_path,
-                    "size": {"width": screenshot.size[0], "height": screenshot.size[1]},
-                    "file_size_bytes": file_size,
-                    "exclude_titlebar": exclude_titlebar,
-                    "custom_path": save_path is not None,
-                    "message": f"Screenshot saved to {'specified path' if save_path else 'temp directory'}",
-                },
+            final_path = self._get_screenshot_path(save_path, image_format)
+
+            # Encode and write off the event loop so other requests are not blocked
+            width, height, file_size = await asyncio.to_thread(
+                self._encode_and_save, screenshot, final_path, image_format, compress_level
             )
 
-            return result.to_dict()
+            logger.info("Screenshot saved: %s (%s bytes)", final_path, file_size)
+
+            result: Dict[str, Any] = {
+                "success": True,
+                "saved_to": final_path,
+                "size": {"width": width, "height": height},
+                "file_size_bytes": file_size,
+                "exclude_titlebar": exclude_titlebar,
+                "image_format": image_format,
+                "custom_path": save_path is not None,
+                "message": f"Screenshot saved to {'specified path' if save_path else 'temp directory'}",
+            }
+
+            return result
 
         except PowerShellMCPError:
             raise
         except Exception as e:
-            logger.error(f"Error capturing terminal response: {e}", exc_info=True)
+            logger.error("Error capturing terminal response: %s", e, exc_info=True)
             return ToolResult(success=False, error=f"Screenshot capture failed: {str(e)}").to_dict()
 
-    def _get_screenshot_path(self, save_path: Optional[str]) -> str:
+    def _encode_and_save(
+        self, screenshot: "Image.Image", path: str, image_format: str, compress_level: int
+    ) -> Tuple[int, int, int]:
+        """Encode screenshot to disk (blocking) and return (width, height, file_size)"""
+        directory = os.path.dirname(path)
+        if directory not in self._known_dirs:
+            self._create_directory(directory)
+
+        # Encode in memory so the file size is known without stat()ing the written file;
+        # PIL's default PNG compress_level=6 dominates capture latency
+        buffer = io.BytesIO()
+        if image_format == "jpeg":
+            if screenshot.mode != "RGB":
+                screenshot = screenshot.convert("RGB")
+            screenshot.save(buffer, format="JPEG", quality=JPEG_QUALITY)
+        else:
+            screenshot.save(buffer, format="PNG", compress_level=compress_level, optimize=False)
+
+        data = buffer.getbuffer()
+        try:
+            f = open(path, "wb")
+        except FileNotFoundError:
+            # The directory was deleted after it was first created, create it again
+            self._known_dirs.discard(directory)
+            self._create_directory(directory)
+            f = open(path, "wb")
+        with f:
+            f.write(data)
+
+        width, height = screenshot.size
+        return width, height, len(data)
+
+    def _create_directory(self, directory: str) -> None:
+        """Create a screenshot directory and remember it"""
+        os.makedirs(directory, exist_ok=True)
+        self._known_dirs.add(directory)
+
+    def _get_screenshot_path(self, save_path: Optional[str], image_format: str = DEFAULT_SCREENSHOT_FORMAT) -> str:
         """Generate appropriate screenshot save path"""
+        extensions = (".jpg", ".jpeg") if image_format == "jpeg" else (".png",)
         if save_path:
             # Validate custom path
-            if not save_path.lower().endswith(".png"):
-                save_path += ".png"
+            if not save_path.lower().endswith(extensions):
+                save_path += extensions[0]
             return os.path.abspath(save_path)
         else:
             # Generate temp path
-            temp_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "..", "temp")
             timestamp = int(time.time())
-            return os.path.join(temp_dir, f"terminal_capture_{timestamp}.png")
+            return os.path.join(self._temp_dir, f"terminal_capture_{timestamp}{extensions[0]}")
+
+    async def _open_stdin_reader(self, threaded: bool = False) -> asyncio.StreamReader:
+        """Connect an asyncio stream reader to stdin, reading from a background thread where the loop can't"""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=STDIN_READ_LIMIT)
+
+        # Only selector loops on POSIX can watch stdin. The Proactor loop (the Windows default) accepts it in
+        # connect_read_pipe but then fails to register fd 0, which is not a Win32 handle, on the first read
+        if not threaded and sys.platform != "win32" and isinstance(loop, asyncio.SelectorEventLoop):
+            try:
+                await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+                return reader
+            except (NotImplementedError, OSError, ValueError) as e:
+                logger.debug("Falling back to threaded stdin reader: %s", e)
+
+        self._stdin_threaded = True
+        threading.Thread(target=self._pump_stdin, args=(loop, reader), daemon=True).start()
+        return reader
+
+    def _pump_stdin(self, loop: asyncio.AbstractEventLoop, reader: asyncio.StreamReader) -> None:
+        """Feed stdin into the stream reader from a background thread"""
+        # Read the descriptor directly, a failed pipe transport may already have closed sys.stdin
+        try:
+            for chunk in iter(lambda: os.read(self._stdin_fd, 65536), b""):
+                loop.call_soon_threadsafe(reader.feed_data, chunk)
+        except OSError as e:
+            logger.error("Error reading stdin: %s", e)
+        finally:
+            loop.call_soon_threadsafe(reader.feed_eof)
+
+    async def _process_and_write(self, line: bytes, request_number: int) -> None:
+        """Parse a single request line, handle it and write the response"""
+        try:
+            request = _loads(line)
+            response = await self.handle_request(request)
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError is a subclass
+            logger.error("Invalid JSON received in request #%s: %s", request_number, e)
+            # Send error response for malformed JSON
+            response = _PARSE_ERROR_RESPONSE
+        except Exception as e:
+            logger.error("Error processing request #%s: %s", request_number, e, exc_info=True)
+            return
+
+        await self._write_response(response)
+
+    async def _write_response(self, response: Response) -> None:
+        """Write a response to stdout without interleaving concurrent responses"""
+        payload = response if isinstance(response, bytes) else _dumps_bytes(response)
+        async with self._write_lock:
+            self._write_stdout(payload + b"\n")
+
+    def _write_stdout(self, payload: bytes) -> None:
+        """Write payload straight to the stdout file descriptor, bypassing Python's buffered IO"""
+        view = memoryview(payload)
+        while view:
+            try:
+                written = os.write(self._stdout_fd, view)
+            except BlockingIOError:
+                # Only happens on POSIX, e.g. when stdout shares a tty with a stdin that was set O_NONBLOCK.
+                # select() only accepts sockets on Windows, so back off briefly there instead
+                if sys.platform == "win32":
+                    time.sleep(STDOUT_RETRY_DELAY)
+                else:
+                    select.select([], [self._stdout_fd], [])
+                continue
+            view = view[written:]
 
     async def run_server(self):
         """Run the MCP server with enhanced logging and error handling"""
-        logger.info(f"Starting PowerShell MCP Server v{SERVER_VERSION}...")
-        logger.info(f"Available tools: {', '.join(self.tools.keys())}")
-        logger.info(f"Default timeout: {self.default_timeout}s")
+        logger.info("Starting PowerShell MCP Server v%s...", SERVER_VERSION)
+        logger.info("Available tools: %s", ", ".join(self.tools.keys()))
+        logger.info("Default timeout: %ss", self.default_timeout)
 
         request_count = 0
+        pending: Set[asyncio.Task] = set()
 
         try:
+            sys.stdout.flush()
+            self._stdout_fd = sys.stdout.fileno()
+            self._stdin_fd = sys.stdin.fileno()
+            reader = await self._open_stdin_reader()
+
             while True:
                 try:
                     # Read request from stdin
-                    line = sys.stdin.readline()
-                    if not line:
-                        logger.info("No more input, shutting down server")
-                        break
-
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    request_count += 1
-                    logger.debug(f"Processing request #{request_count}")
-
-                    request = json.loads(line)
-                    response = await self.handle_request(request)
-
-                    # Write response to stdout
-                    print(json.dumps(response))
-                    sys.stdout.flush()
-
-                except json.JSONDecodeError as e:
-                    logger.error(f"Invalid JSON received in request #{request_count}: {e}")
-                    # Send error response for malformed JSON
-                    error_response = self._create_error_response(1, -32700, "Parse error")
-                    print(json.dumps(error_response))
-                    sys.stdout.flush()
+                    line = await reader.readline()
+                except ValueError as e:
+                    logger.error("Request exceeds %s bytes: %s", STDIN_READ_LIMIT, e)
+                    await self._write_response(_PARSE_ERROR_RESPONSE)
                     continue
-                except Exception as e:
-                    logger.error(f"Error processing request #{request_count}: {e}", exc_info=True)
+                except OSError as e:
+                    if self._stdin_threaded:
+                        raise
+                    # The loop could not read stdin after all, nothing was consumed so switch readers
+                    logger.warning("Stdin pipe transport failed, switching to threaded reader: %s", e)
+                    reader = await self._open_stdin_reader(threaded=True)
                     continue
 
+                if not line:
+                    logger.info("No more input, shutting down server")
+                    break
+
+                line = line.strip()
+                if not line:
+                    continue
+
+                request_count += 1
+                logger.debug("Processing request #%s", request_count)
+
+                # Dispatch concurrently so long-running tools don't block subsequent requests
+                task = asyncio.create_task(self._process_and_write(line, request_count))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+
+            if pending:
+                await asyncio.gather(*pending)
+
         except KeyboardInterrupt:
             logger.info("Server interrupted by user")
         except Exception as e:
-            logger.error(f"Fatal server error: {e}", exc_info=True)
+            logger.error("Fatal server error: %s", e, exc_info=True)
         finally:
-            logger.info(f"PowerShell MCP Server stopped after processing {request_count} requests")
+            logger.info("PowerShell MCP Server stopped after processing %s requests", request_count)
@@ -0,0 +1,62 @@
+import ctypes
+import logging
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+CF_UNICODETEXT = 13
+OPEN_CLIPBOARD_ATTEMPTS = 10
+OPEN_CLIPBOARD_RETRY_DELAY = 0.01
+
+if sys.platform == "win32":
+    from ctypes import wintypes
+
+    _user32 = ctypes.WinDLL("user32", use_last_error=True)
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+    _user32.OpenClipboard.argtypes = [wintypes.HWND]
+    _user32.OpenClipboard.restype = wintypes.BOOL
+    _user32.CloseClipboard.argtypes = []
+    _user32.CloseClipboard.restype = wintypes.BOOL
+    _user32.GetClipboardData.argtypes = [wintypes.UINT]
+    _user32.GetClipboardData.restype = wintypes.HANDLE
+    _kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+    _kernel32.GlobalLock.restype = wintypes.LPVOID
+    _kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+    _kernel32.GlobalUnlock.restype = wintypes.BOOL
+
+
+def _open_clipboard() -> None:
+    """Open the clipboard, retrying briefly while another process holds it"""
+    for attempt in range(OPEN_CLIPBOARD_ATTEMPTS):
+        if _user32.OpenClipboard(None):
+            return
+        logger.debug("Clipboard busy, attempt %s/%s", attempt + 1, OPEN_CLIPBOARD_ATTEMPTS)
+        time.sleep(OPEN_CLIPBOARD_RETRY_DELAY)
+    raise ctypes.WinError(ctypes.get_last_error())
+
+
+def paste_text() -> str:
+    """Read Unicode text from the clipboard directly through user32 (pyperclip on other platforms)"""
+    if sys.platform != "win32":
+        import pyperclip
+
+        return pyperclip.paste()
+
+    _open_clipboard()
+    try:
+        handle = _user32.GetClipboardData(CF_UNICODETEXT)
+        if not handle:
+            # No text on the clipboard
+            return ""
+
+        locked = _kernel32.GlobalLock(handle)
+        if not locked:
+            raise ctypes.WinError(ctypes.get_last_error())
+        try:
+            return ctypes.wstring_at(locked)
+        finally:
+            _kernel32.GlobalUnlock(handle)
+    finally:
+        _user32.CloseClipboard()
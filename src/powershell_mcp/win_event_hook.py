@@ -0,0 +1,133 @@
+import ctypes
+import logging
+import threading
+from ctypes import wintypes
+from typing import Callable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+EVENT_SYSTEM_FOREGROUND = 0x0003
+EVENT_OBJECT_SHOW = 0x8002
+EVENT_OBJECT_NAMECHANGE = 0x800C
+WINEVENT_OUTOFCONTEXT = 0x0000
+WINEVENT_SKIPOWNPROCESS = 0x0002
+OBJID_WINDOW = 0
+CHILDID_SELF = 0
+WM_QUIT = 0x0012
+PM_NOREMOVE = 0x0000
+HOOK_START_TIMEOUT = 1.0
+
+WinEventProc = ctypes.WINFUNCTYPE(
+    None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND, wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+)
+
+_user32 = ctypes.WinDLL("user32", use_last_error=True)
+_kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+_user32.SetWinEventHook.argtypes = [
+    wintypes.DWORD,
+    wintypes.DWORD,
+    wintypes.HMODULE,
+    WinEventProc,
+    wintypes.DWORD,
+    wintypes.DWORD,
+    wintypes.DWORD,
+]
+_user32.SetWinEventHook.restype = wintypes.HANDLE
+_user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+_user32.UnhookWinEvent.restype = wintypes.BOOL
+_user32.GetMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT]
+_user32.GetMessageW.restype = wintypes.BOOL
+_user32.PeekMessageW.argtypes = [
+    ctypes.POINTER(wintypes.MSG),
+    wintypes.HWND,
+    wintypes.UINT,
+    wintypes.UINT,
+    wintypes.UINT,
+]
+_user32.PeekMessageW.restype = wintypes.BOOL
+_user32.TranslateMessage.argtypes = [ctypes.POINTER(wintypes.MSG)]
+_user32.TranslateMessage.restype = wintypes.BOOL
+_user32.DispatchMessageW.argtypes = [ctypes.POINTER(wintypes.MSG)]
+_user32.DispatchMessageW.restype = ctypes.c_ssize_t
+_user32.PostThreadMessageW.argtypes = [wintypes.DWORD, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+_user32.PostThreadMessageW.restype = wintypes.BOOL
+_kernel32.GetCurrentThreadId.argtypes = []
+_kernel32.GetCurrentThreadId.restype = wintypes.DWORD
+
+
+class WinEventHook:
+    """Out-of-context WinEvent hooks serviced by their own message loop thread, calls callback(event, hwnd)"""
+
+    def __init__(self, events: Sequence[int], callback: Callable[[int, int], None]):
+        # One hook per event code, a range would also deliver every event code in between
+        self.events = tuple(events)
+        self.callback = callback
+        self.installed = False
+        self._proc = WinEventProc(self._handle_event)  # must stay referenced while the hook is installed
+        self._thread: Optional[threading.Thread] = None
+        self._thread_id = 0
+        self._started = threading.Event()
+
+    def start(self) -> bool:
+        """Install the hooks on a background thread, returns whether all of them were installed"""
+        self._thread = threading.Thread(target=self._run, name="WinEventHook", daemon=True)
+        self._thread.start()
+        self._started.wait(HOOK_START_TIMEOUT)
+        return self.installed
+
+    def stop(self) -> None:
+        """Stop the message loop and remove the hooks"""
+        if self._thread is None:
+            return
+        if self._thread_id:
+            _user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+        self._thread.join(HOOK_START_TIMEOUT)
+        self._thread = None
+        self.installed = False
+
+    def __enter__(self) -> "WinEventHook":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        # Out-of-context callbacks are delivered through the installing thread's message queue
+        msg = wintypes.MSG()
+        # Make sure the thread has a message queue before anyone posts WM_QUIT to it
+        _user32.PeekMessageW(ctypes.byref(msg), None, 0, 0, PM_NOREMOVE)
+        self._thread_id = _kernel32.GetCurrentThreadId()
+
+        hooks: List[int] = []
+        for event in self.events:
+            hook = _user32.SetWinEventHook(
+                event, event, None, self._proc, 0, 0, WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS
+            )
+            if not hook:
+                logger.warning("SetWinEventHook failed: %s", ctypes.WinError(ctypes.get_last_error()))
+                break
+            hooks.append(hook)
+
+        self.installed = len(hooks) == len(self.events)
+        self._started.set()
+
+        try:
+            if self.installed:
+                while _user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                    _user32.TranslateMessage(ctypes.byref(msg))
+                    _user32.DispatchMessageW(ctypes.byref(msg))
+        finally:
+            for hook in hooks:
+                _user32.UnhookWinEvent(hook)
+
+    def _handle_event(
+        self, hook: int, event: int, hwnd: int, id_object: int, id_child: int, thread_id: int, event_time: int
+    ) -> None:
+        if id_object != OBJID_WINDOW or id_child != CHILDID_SELF or not hwnd:
+            return
+        try:
+            self.callback(event, hwnd)
+        except Exception as e:
+            logger.debug("WinEvent callback failed: %s", e)
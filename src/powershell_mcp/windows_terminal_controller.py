@@ -1,42 +1,144 @@
+import ctypes
+import functools
+import re
 import subprocess
-from PIL import Image, ImageGrab
-import psutil
-import pygetwindow as gw
-from typing import Dict, Optional
+import threading
+from ctypes import wintypes
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 import time
-import pyautogui
-import pyperclip
+import pywintypes
+import win32api
+import win32con
+import win32event
+import win32gui
+import win32ui
 import logging
+from powershell_mcp.win_event_hook import (
+    EVENT_OBJECT_NAMECHANGE,
+    EVENT_OBJECT_SHOW,
+    EVENT_SYSTEM_FOREGROUND,
+    WinEventHook,
+)
+
+if TYPE_CHECKING:
+    from PIL import Image
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Settle time between pasting and pressing Enter (pyautogui.PAUSE is 0, so this is the only wait)
+DEFAULT_PASTE_PAUSE = 0.02
+# Delay between keystrokes when text is typed instead of pasted
+TYPE_INTERVAL = 0.03
+# Settle time after Ctrl+C so the shell redraws its prompt before new input arrives
+CLEAR_INPUT_DELAY = 0.2
+# Upper bound on waiting for the OS to confirm a foreground window change
+FOCUS_TIMEOUT = 0.5
+TERMINAL_EXECUTABLES = ("wt.exe", "pwsh.exe", "powershell.exe")
+# Lowercased process names checked before falling back to command lines
+TERMINAL_PROCESS_NAMES = frozenset({"windowsterminal.exe", *TERMINAL_EXECUTABLES})
+TERMINAL_CMDLINE_RE = re.compile("|".join(re.escape(exe) for exe in TERMINAL_EXECUTABLES), re.IGNORECASE)
+# PrintWindow flags: client area only, and ask DirectComposition windows to render their content
+PW_CLIENTONLY = 0x1
+PW_RENDERFULLCONTENT = 0x2
+DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2 = -4
+
+_user32 = ctypes.WinDLL("user32", use_last_error=True)
+_user32.PrintWindow.argtypes = [wintypes.HWND, wintypes.HDC, wintypes.UINT]
+_user32.PrintWindow.restype = wintypes.BOOL
+_user32.SetProcessDPIAware.argtypes = []
+_user32.SetProcessDPIAware.restype = wintypes.BOOL
+if hasattr(_user32, "SetProcessDpiAwarenessContext"):  # Windows 10 1703 and later
+    _user32.SetProcessDpiAwarenessContext.argtypes = [wintypes.HANDLE]
+    _user32.SetProcessDpiAwarenessContext.restype = wintypes.BOOL
+
+
+@functools.cache
+def _set_dpi_awareness() -> None:
+    """Make window rects match the physical pixels that PrintWindow, ImageGrab and pyautogui work in"""
+    # Done explicitly since pyautogui, which used to set it on import at startup, is now imported lazily
+    if hasattr(_user32, "SetProcessDpiAwarenessContext"):
+        if _user32.SetProcessDpiAwarenessContext(DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2):
+            return
+        logger.debug("SetProcessDpiAwarenessContext failed: %s", ctypes.WinError(ctypes.get_last_error()))
+    _user32.SetProcessDPIAware()
+
+
+# GUI and process libraries are imported on first use, pyautogui alone takes hundreds of ms to load
+@functools.cache
+def _pyautogui() -> ModuleType:
+    """Import and configure pyautogui"""
+    import pyautogui
+
+    pyautogui.FAILSAFE = True
+    # No implicit sleep after every pyautogui call; the controller waits explicitly where needed
+    pyautogui.PAUSE = 0.0
+    return pyautogui
+
+
+@functools.cache
+def _pyperclip() -> ModuleType:
+    """Import pyperclip bound to its Win32 backend"""
+    import pyperclip
+
+    # Skip pyperclip's backend detection, which otherwise runs on the first copy
+    pyperclip.set_clipboard("windows")
+    return pyperclip
+
+
+@functools.cache
+def _psutil() -> ModuleType:
+    """Import psutil"""
+    import psutil
+
+    return psutil
+
 
 class WindowsTerminalController:
     """Controller for Windows Terminal PowerShell operations"""
 
-    def __init__(self, timeout: int = 30):
+    def __init__(self, timeout: int = 30, paste_pause: float = DEFAULT_PASTE_PAUSE):
+        _set_dpi_awareness()
         self.timeout = timeout
+        self.paste_pause = paste_pause
         self.terminal_process = None
+        self._cached_hwnd: Optional[int] = None
+        # Set by a foreground WinEvent hook once the window being focused becomes active
+        self._focus_target: Optional[int] = None
+        self._focus_confirmed = threading.Event()
+        self._foreground_hook: Optional[WinEventHook] = None
         self.terminal_window_titles = ["Windows PowerShell", "PowerShell", "Windows Terminal", "Command Prompt", "cmd"]
 
     def is_terminal_running(self) -> bool:
-        """Check if Windows Terminal with PowerShell is running"""
-        for proc in psutil.process_iter(["pid", "name", "cmdline"]):
+        """Check if Windows Terminal with PowerShell is running, checking cheap process names before command lines"""
+        if self.terminal_process is not None and self.terminal_process.poll() is None:
+            return True
+
+        psutil = _psutil()
+        for proc in psutil.process_iter(["name"]):
             try:
-                if proc.info["name"] and "WindowsTerminal" in proc.info["name"]:
+                if (proc.info["name"] or "").lower() in TERMINAL_PROCESS_NAMES:
+                    return True
+                # Command lines are expensive to read on Windows (queried from each process's PEB), so only on a miss
+                if any(TERMINAL_CMDLINE_RE.search(arg) for arg in proc.cmdline()):
                     return True
-                if proc.info["cmdline"]:
-                    cmdline = " ".join(proc.info["cmdline"])
-                    if any(cmd in cmdline for cmd in ["wt.exe", "pwsh.exe", "powershell.exe"]):
-                        return True
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
         return False
 
     def launch_terminal(self) -> bool:
         """Launch Windows Terminal with PowerShell and wait for window to be ready"""
+        # Signalled by a WinEvent hook as soon as a window with a terminal title is shown
+        window_shown = win32event.CreateEvent(None, True, False, None)
+
+        def on_window_event(event: int, hwnd: int) -> None:
+            if self._matches_terminal_title(win32gui.GetWindowText(hwnd)):
+                win32event.SetEvent(window_shown)
+
+        window_hook = WinEventHook([EVENT_OBJECT_SHOW, EVENT_OBJECT_NAMECHANGE], on_window_event)
+        if not window_hook.start():
+            logger.debug("WinEvent hook unavailable, polling for the terminal window")
+
         try:
             commands = [["wt.exe", "-p", "PowerShell"], ["wt.exe", "pwsh.exe"], ["wt.exe"], ["pwsh.exe"], ["powershell.exe"]]
 
@@ -44,7 +146,8 @@ class WindowsTerminalController:
             for cmd in commands:
                 try:
                     cmd_str = " ".join(cmd)
-                    logger.info(f"Attempting to launch with command: {cmd_str}")
+                    logger.info("Attempting to launch with command: %s", cmd_str)
+                    win32event.ResetEvent(window_shown)
 
                     # Fix: Use shell=False when passing a list of arguments
                     # For single-command executables like pwsh.exe or powershell.exe
@@ -52,8 +155,8 @@ class WindowsTerminalController:
                         self.terminal_process = subprocess.Popen(
                             cmd[0],
                             shell=True,
-                            stdout=subprocess.PIPE,
-                            stderr=subprocess.PIPE,
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL,
                             creationflags=subprocess.CREATE_NEW_CONSOLE,
                         )
                     else:
@@ -61,45 +164,53 @@ class WindowsTerminalController:
                         self.terminal_process = subprocess.Popen(
                             cmd,
                             shell=False,
-                            stdout=subprocess.PIPE,
-                            stderr=subprocess.PIPE,
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL,
                             creationflags=subprocess.CREATE_NEW_CONSOLE,
                         )
 
                     # Check process state immediately
-                    if self.terminal_process.poll() is not None:
-                        # Process terminated immediately
-                        stdout, stderr = self.terminal_process.communicate(timeout=1)
-                        exit_code = self.terminal_process.returncode
-                        logger.warning(f"Command {cmd_str} terminated immediately with exit code {exit_code}")
-                        logger.warning(f"Stdout: {stdout.decode('utf-8', errors='ignore')}")
-                        logger.warning(f"Stderr: {stderr.decode('utf-8', errors='ignore')}")
+                    exit_code = self.terminal_process.poll()
+                    if exit_code is not None:
+                        logger.warning("Command %s terminated immediately with exit code %s", cmd_str, exit_code)
                         continue
 
                     # Wait for process to start and window to appear
                     max_wait = 15  # seconds
                     poll_interval = 0.5
-                    waited = 0
 
-                    logger.info(f"Waiting for terminal window to appear (PID: {self.terminal_process.pid})")
-                    while waited < max_wait:
-                        # Check if process is still running
-                        if self.terminal_process.poll() is not None:
-                            logger.warning(f"Terminal process exited prematurely with code {self.terminal_process.returncode}")
+                    logger.info("Waiting for terminal window to appear (PID: %s)", self.terminal_process.pid)
+
+                    # Block until the terminal's message loop is ready, then look for the window once
+                    wait_started = time.monotonic()
+                    if self._wait_for_input_idle(max_wait) and self.find_terminal_window():
+                        logger.info("Terminal launched and window found with command: %s", cmd_str)
+                        self.focus_terminal()
+                        return True
+
+                    # Otherwise sleep in the kernel until the process exits or a terminal window is shown;
+                    # without the hook this degrades to polling every poll_interval
+                    process_handle = int(self.terminal_process._handle)
+                    deadline = wait_started + max_wait
+                    while (remaining := deadline - time.monotonic()) > 0:
+                        timeout = remaining if window_hook.installed else min(remaining, poll_interval)
+                        result = win32event.WaitForMultipleObjects([process_handle, window_shown], False, int(timeout * 1000))
+
+                        if result == win32event.WAIT_OBJECT_0:
+                            logger.warning("Terminal process exited prematurely with code %s", self.terminal_process.poll())
                             break
 
-                        # Check if terminal window is found
-                        if self.is_terminal_running() and self.find_terminal_window():
-                            logger.info(f"Terminal launched and window found with command: {cmd_str}")
+                        if self.find_terminal_window():
+                            logger.info("Terminal launched and window found with command: %s", cmd_str)
                             # Try to focus the window as well
                             self.focus_terminal()
                             return True
 
-                        time.sleep(poll_interval)
-                        waited += poll_interval
-                        logger.debug(f"Waited {waited}s for terminal window to appear")
+                        # The shown window was not usable yet, wait for the next one
+                        win32event.ResetEvent(window_shown)
+                        logger.debug("Waited %.2fs for terminal window to appear", time.monotonic() - wait_started)
 
-                    logger.warning(f"Terminal process started but window not found after {max_wait}s for command: {cmd_str}")
+                    logger.warning("Terminal process started but window not found after %ss for command: %s", max_wait, cmd_str)
 
                     # Try to terminate the process if it's still running
                     if self.terminal_process.poll() is None:
@@ -108,17 +219,17 @@ class WindowsTerminalController:
                             self.terminal_process.terminate()
                             self.terminal_process.wait(timeout=3)
                         except (subprocess.TimeoutExpired, Exception) as e:
-                            logger.warning(f"Failed to terminate process: {e}")
+                            logger.warning("Failed to terminate process: %s", e)
                             try:
                                 self.terminal_process.kill()
                             except Exception as e:
-                                logger.warning(f"Failed to kill process: {e}")
+                                logger.warning("Failed to kill process: %s", e)
 
                 except FileNotFoundError:
-                    logger.warning(f"Command not found: {' '.join(cmd)}")
+                    logger.warning("Command not found: %s", " ".join(cmd))
                     continue
                 except Exception as e:
-                    logger.warning(f"Failed to launch with {' '.join(cmd)}: {e}")
+                    logger.warning("Failed to launch with %s: %s", " ".join(cmd), e)
                     continue
 
             # All attempts failed
@@ -126,179 +237,337 @@ class WindowsTerminalController:
             return False
 
         except Exception as e:
-            logger.error(f"Error launching terminal: {e}")
+            logger.error("Error launching terminal: %s", e)
+            return False
+        finally:
+            window_hook.stop()
+
+    def _wait_for_input_idle(self, timeout: float) -> bool:
+        """Wait until the launched process, or a GUI process it spawned, is idle and ready for input"""
+        if self.terminal_process is None:
+            return False
+
+        deadline = time.monotonic() + timeout
+        if self._wait_handle_idle(int(self.terminal_process._handle), deadline):
+            return True
+
+        # wt.exe is a launcher that exits, so also wait on the terminal processes it spawned
+        psutil = _psutil()
+        try:
+            children = psutil.Process(self.terminal_process.pid).children(recursive=True)
+        except psutil.Error as e:
+            logger.debug("Could not enumerate child processes: %s", e)
             return False
 
+        for child in children:
+            try:
+                handle = win32api.OpenProcess(win32con.PROCESS_QUERY_INFORMATION | win32con.SYNCHRONIZE, False, child.pid)
+            except pywintypes.error as e:
+                logger.debug("Could not open child process %s: %s", child.pid, e)
+                continue
+            if self._wait_handle_idle(handle, deadline):
+                return True
+        return False
+
+    def _wait_handle_idle(self, handle: int, deadline: float) -> bool:
+        """Call WaitForInputIdle on a process handle, bounded by a monotonic deadline"""
+        remaining_ms = max(0, int((deadline - time.monotonic()) * 1000))
+        try:
+            # Returns WAIT_TIMEOUT, or WAIT_FAILED for console processes without a message queue
+            return win32event.WaitForInputIdle(handle, remaining_ms) == win32event.WAIT_OBJECT_0
+        except pywintypes.error as e:
+            logger.debug("WaitForInputIdle failed: %s", e)
+            return False
+
+    def _matches_terminal_title(self, title: str) -> bool:
+        """Check a window title against the known terminal titles (case-insensitive substring)"""
+        title = title.upper()
+        return any(expected.upper() in title for expected in self.terminal_window_titles)
+
+    def _find_hwnd(self) -> Optional[int]:
+        """Enumerate visible top-level windows once and return the best matching terminal window"""
+        matches: List[Tuple[int, str]] = []
+
+        def callback(hwnd: int, _: Any) -> bool:
+            if win32gui.IsWindowVisible(hwnd):
+                title = win32gui.GetWindowText(hwnd)
+                if title and self._matches_terminal_title(title):
+                    matches.append((hwnd, title.upper()))
+            return True
+
+        win32gui.EnumWindows(callback, None)
+
+        # Prefer matches in the order of terminal_window_titles
+        for expected in self.terminal_window_titles:
+            expected = expected.upper()
+            for hwnd, title in matches:
+                if expected in title:
+                    logger.debug("Found window with title: %s", win32gui.GetWindowText(hwnd))
+                    return hwnd
+        return None
+
+    def _get_terminal_hwnd(self) -> Optional[int]:
+        """Return the cached terminal window if it still exists, is visible and its title matches, else search again"""
+        hwnd = self._cached_hwnd
+        if hwnd is not None:
+            # Same conditions as _find_hwnd, a hidden window (e.g. sent to the tray) must not be reused
+            if (
+                win32gui.IsWindow(hwnd)
+                and win32gui.IsWindowVisible(hwnd)
+                and self._matches_terminal_title(win32gui.GetWindowText(hwnd))
+            ):
+                return hwnd
+            logger.debug("Cached terminal window is no longer valid")
+
+        self._cached_hwnd = self._find_hwnd()
+        return self._cached_hwnd
+
     def find_terminal_window(self) -> Optional[Dict[str, int]]:
         """Find Windows Terminal window coordinates"""
         try:
-            for title in self.terminal_window_titles:
-                try:
-                    windows = gw.getWindowsWithTitle(title)
-                    if windows:
-                        window = windows[0]
-                        if window.isMinimized:
-                            window.restore()
-                            time.sleep(0.5)
-
-                        return {"left": window.left, "top": window.top, "width": window.width, "height": window.height}
-                except Exception as e:
-                    logger.debug(f"Error checking window title '{title}': {e}")
-                    continue
+            hwnd = self._get_terminal_hwnd()
+            if hwnd is None:
+                logger.warning("No terminal windows found")
+                return None
 
-            logger.warning("No terminal windows found")
-            return None
+            self._restore_if_minimized(hwnd)
+            left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+            return {"left": left, "top": top, "width": right - left, "height": bottom - top}
 
         except Exception as e:
-            logger.error(f"Error finding terminal window: {e}")
+            logger.error("Error finding terminal window: %s", e)
             return None
 
-    def focus_terminal(self) -> bool:
-        """Focus on the terminal window"""
-        try:
-            windows = []
+    def _restore_if_minimized(self, hwnd: int) -> None:
+        """Restore a minimized window so it can be focused and captured"""
+        if win32gui.IsIconic(hwnd):
+            win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+            time.sleep(0.5)
 
-            # Collect all potential terminal windows
-            for title in self.terminal_window_titles:
-                try:
-                    wins = gw.getWindowsWithTitle(title)
-                    if wins:
-                        windows.extend(wins)
-                        logger.debug(f"Found window with title: {title}")
-                except Exception as e:
-                    logger.debug(f"Error searching for window with title '{title}': {e}")
-
-            if not windows:
+    def focus_terminal(self) -> Optional[int]:
+        """Focus on the terminal window, returns its handle for reuse by the caller"""
+        try:
+            hwnd = self._get_terminal_hwnd()
+            if hwnd is None:
                 logger.error("No terminal windows found")
-                return False
+                return None
 
-            # Try to activate the first found window
-            window = windows[0]
-            logger.info(f"Focusing window: {window.title}")
+            # Already in front, nothing to activate or wait for
+            if win32gui.GetForegroundWindow() == hwnd and not win32gui.IsIconic(hwnd):
+                return hwnd
 
-            # Multiple activation attempts
-            try:
-                if window.isMinimized:
-                    window.restore()
-                    time.sleep(0.5)
+            logger.info("Focusing window: %s", win32gui.GetWindowText(hwnd))
 
-                window.activate()
-                time.sleep(0.5)
+            # Multiple activation attempts, each returning as soon as the window is reported active
+            self._expect_foreground(hwnd)
+            try:
+                if win32gui.IsIconic(hwnd):
+                    win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+                win32gui.SetForegroundWindow(hwnd)
+                self._wait_for_foreground(hwnd)
 
             except Exception as e:
-                logger.warning(f"Standard activate failed, trying alternative: {e}")
+                logger.warning("Standard activate failed, trying alternative: %s", e)
                 try:
-                    window.minimize()
+                    win32gui.ShowWindow(hwnd, win32con.SW_MINIMIZE)
                     time.sleep(0.2)
-                    window.restore()
-                    time.sleep(0.5)
+                    self._focus_confirmed.clear()
+                    win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+                    self._wait_for_foreground(hwnd)
                 except Exception as e2:
-                    logger.warning(f"Alternative activation also failed: {e2}")
+                    logger.warning("Alternative activation also failed: %s", e2)
+                    self._cached_hwnd = None
+            finally:
+                self._focus_target = None
 
             # Verify focus
             try:
-                active_window = gw.getActiveWindow()
-                if active_window and window.title in active_window.title:
+                active_hwnd = win32gui.GetForegroundWindow()
+                if active_hwnd == hwnd:
                     logger.info("Successfully focused terminal window")
-                    return True
+                    return hwnd
                 else:
-                    logger.warning(f"Focus verification failed. Active: {getattr(active_window, 'title', 'None')}")
-                    return True  # Still return True as command might work
+                    logger.warning("Focus verification failed. Active: %s", win32gui.GetWindowText(active_hwnd))
+                    return hwnd  # Still return the window as command might work
             except Exception:
                 logger.warning("Could not verify focus, but continuing...")
-                return True
+                return hwnd
 
         except Exception as e:
-            logger.error(f"Error focusing terminal: {e}")
-            return False
+            logger.error("Error focusing terminal: %s", e)
+            self._cached_hwnd = None
+            return None
 
-    def capture_terminal_output(self, exclude_titlebar: bool = True) -> Optional[Image.Image]:
-        """Capture terminal window output"""
+    def _expect_foreground(self, hwnd: int) -> None:
+        """Arm the foreground hook for hwnd, installing it on first use"""
+        if self._foreground_hook is None:
+            self._foreground_hook = WinEventHook([EVENT_SYSTEM_FOREGROUND], self._on_foreground)
+            if not self._foreground_hook.start():
+                logger.debug("Foreground hook unavailable, focus waits use the full timeout")
+
+        self._focus_target = hwnd
+        self._focus_confirmed.clear()
+
+    def _on_foreground(self, event: int, hwnd: int) -> None:
+        if hwnd == self._focus_target:
+            self._focus_confirmed.set()
+
+    def _wait_for_foreground(self, hwnd: int) -> bool:
+        """Wait until hwnd is the foreground window, bounded by FOCUS_TIMEOUT"""
+        if win32gui.GetForegroundWindow() == hwnd:
+            return True
+        return self._focus_confirmed.wait(FOCUS_TIMEOUT)
+
+    def capture_terminal_output(self, exclude_titlebar: bool = True, hwnd: Optional[int] = None) -> Optional["Image.Image"]:
+        """Capture terminal window output, reusing hwnd from focus_terminal when given"""
         try:
-            window_coords = self.find_terminal_window()
-            if not window_coords:
-                logger.error("Could not find terminal window for capture")
-                return None
+            if hwnd is None:
+                hwnd = self._get_terminal_hwnd()
+                if hwnd is None:
+                    logger.error("Could not find terminal window for capture")
+                    return None
 
-            left = window_coords["left"]
-            top = window_coords["top"]
-            width = window_coords["width"]
-            height = window_coords["height"]
+            # PrintWindow cannot render a minimized window
+            self._restore_if_minimized(hwnd)
 
-            # Optionally exclude title bar
-            if exclude_titlebar:
-                title_bar_height = 35
-                top += title_bar_height
-                height -= title_bar_height
+            left, top, right, bottom = self._capture_bounds(hwnd, exclude_titlebar)
+            width = right - left
+            height = bottom - top
 
             # Ensure coordinates are valid
             if width <= 0 or height <= 0:
-                logger.error(f"Invalid window dimensions: {width}x{height}")
+                logger.error("Invalid window dimensions: %sx%s", width, height)
                 return None
 
-            # Capture the specified region
-            screenshot = ImageGrab.grab(bbox=(left, top, left + width, top + height))
-            logger.info(f"Successfully captured terminal screenshot: {screenshot.size}")
+            screenshot = self._print_window(hwnd, width, height, exclude_titlebar)
+            if screenshot is None:
+                # Falls back to grabbing the screen region, which only works while the window is unobscured
+                logger.warning("PrintWindow failed, capturing screen region instead")
+                from PIL import ImageGrab
+
+                screenshot = ImageGrab.grab(bbox=(left, top, right, bottom))
+
+            logger.info("Successfully captured terminal screenshot: %s", screenshot.size)
             return screenshot
 
         except Exception as e:
-            logger.error(f"Error capturing terminal output: {e}")
+            logger.error("Error capturing terminal output: %s", e)
             return None
 
-    def type_command(self, command: str, execute: bool = True) -> bool:
-        """Type command into terminal with optional execution"""
+    def _capture_bounds(self, hwnd: int, exclude_titlebar: bool) -> Tuple[int, int, int, int]:
+        """Screen coordinates of the client area (without title bar) or of the whole window"""
+        if not exclude_titlebar:
+            return win32gui.GetWindowRect(hwnd)
+
+        _, _, width, height = win32gui.GetClientRect(hwnd)
+        left, top = win32gui.ClientToScreen(hwnd, (0, 0))
+        return left, top, left + width, top + height
+
+    def _print_window(self, hwnd: int, width: int, height: int, exclude_titlebar: bool) -> Optional["Image.Image"]:
+        """Render the window into an offscreen bitmap with PrintWindow, works even when it is covered"""
+        flags = PW_RENDERFULLCONTENT | (PW_CLIENTONLY if exclude_titlebar else 0)
+
+        window_dc = win32gui.GetWindowDC(hwnd)
+        source_dc = win32ui.CreateDCFromHandle(window_dc)
+        memory_dc = source_dc.CreateCompatibleDC()
+        bitmap = win32ui.CreateBitmap()
+        previous_bitmap = None
+        try:
+            bitmap.CreateCompatibleBitmap(source_dc, width, height)
+            previous_bitmap = memory_dc.SelectObject(bitmap)
+            if not _user32.PrintWindow(hwnd, memory_dc.GetSafeHdc(), flags):
+                logger.debug("PrintWindow failed: %s", ctypes.WinError(ctypes.get_last_error()))
+                return None
+
+            from PIL import Image
+
+            # 32bpp DIB rows are BGRX, copy them straight into an RGB image
+            bits = bitmap.GetBitmapBits(True)
+            return Image.frombuffer("RGB", (width, height), bits, "raw", "BGRX", 0, 1)
+        finally:
+            # GDI won't delete a bitmap that is still selected into a DC, so deselect it first
+            if previous_bitmap is not None:
+                memory_dc.SelectObject(previous_bitmap)
+            memory_dc.DeleteDC()
+            if bitmap.GetHandle():
+                win32gui.DeleteObject(bitmap.GetHandle())
+            source_dc.DeleteDC()
+            win32gui.ReleaseDC(hwnd, window_dc)
+
+    def _clear_input(self) -> None:
+        """Clear any partially typed input on the prompt"""
+        _pyautogui().hotkey("ctrl", "c")
+        # Nothing signals that the prompt has redrawn: WaitForInputIdle only reports a process's first idle after
+        # startup, and the window belongs to WindowsTerminal.exe rather than the shell handling Ctrl+C
+        time.sleep(CLEAR_INPUT_DELAY)
+
+    def _send_text(self, text: str, method: str = "paste") -> None:
+        """Send text to the focused terminal via the clipboard ("paste") or literal keystrokes ("type")"""
+        if method == "paste":
+            # One clipboard write and one hotkey, independent of the text length
+            _pyperclip().copy(text)
+            time.sleep(0.1)
+            _pyautogui().hotkey("ctrl", "v")
+        elif method == "type":
+            # Type with slight delay between keystrokes
+            _pyautogui().typewrite(text, interval=TYPE_INTERVAL)
+        else:
+            raise ValueError(f"Unknown send method: {method}")
+
+    def type_command(self, command: str, execute: bool = True, method: str = "paste", clear_input: bool = False) -> bool:
+        """Type command into terminal with optional execution (method="type" sends literal keystrokes)"""
         try:
-            logger.info(f"Typing command: {command[:50]}{'...' if len(command) > 50 else ''}")
+            logger.info("Typing command: %s%s", command[:50], "..." if len(command) > 50 else "")
 
-            if not self.focus_terminal():
+            hwnd = self.focus_terminal()
+            if hwnd is None:
                 logger.error("Failed to focus terminal window")
                 return False
 
-            # Clear any existing input
-            pyautogui.hotkey("ctrl", "c")
-            time.sleep(0.2)
+            # Ctrl+C costs a round trip and cancels whatever is running, so only clear on request
+            if clear_input:
+                self._clear_input()
 
-            # Type the command with slight delay between keystrokes
-            pyautogui.typewrite(command, interval=0.03)
+            self._send_text(command, method)
 
             if execute:
                 logger.info("Executing command...")
-                pyautogui.press("enter")
+                time.sleep(self.paste_pause)
+                _pyautogui().press("enter")
             else:
                 logger.info("Command typed but not executed")
 
             return True
 
         except Exception as e:
-            logger.error(f"Error typing command: {e}")
+            logger.error("Error typing command: %s", e)
             return False
 
-    def paste_content(self, content: str, execute: bool = True) -> bool:
+    def paste_content(self, content: str, execute: bool = True, clear_input: bool = False) -> bool:
         """Paste content to terminal using clipboard"""
         try:
-            logger.info(f"Pasting content of length: {len(content)}")
+            logger.info("Pasting content of length: %s", len(content))
 
-            if not self.focus_terminal():
+            hwnd = self.focus_terminal()
+            if hwnd is None:
                 logger.error("Failed to focus terminal window")
                 return False
 
-            # Clear any existing input
-            pyautogui.hotkey("ctrl", "c")
-            time.sleep(0.2)
+            # Ctrl+C costs a round trip and cancels whatever is running, so only clear on request
+            if clear_input:
+                self._clear_input()
 
-            # Set clipboard content and paste
-            pyperclip.copy(content)
-            time.sleep(0.1)
-            pyautogui.hotkey("ctrl", "v")
+            self._send_text(content, "paste")
 
             if execute:
                 logger.info("Executing pasted content...")
-                pyautogui.press("enter")
+                time.sleep(self.paste_pause)
+                _pyautogui().press("enter")
             else:
                 logger.info("Content pasted but not executed")
 
             return True
 
         except Exception as e:
-            logger.error(f"Error pasting content: {e}")
+            logger.error("Error pasting content: %s", e)
             return False
@@ -0,0 +1,172 @@
+"""Tests for request handling in the PowerShell MCP server."""
+
+import json
+import sys
+import types
+import unittest
+from typing import Any, List
+from unittest import mock
+
+if sys.platform != "win32":
+    # The terminal controller needs pywin32; the request handling under test never touches it
+    _controller_stub = types.ModuleType("powershell_mcp.windows_terminal_controller")
+    _controller_stub.WindowsTerminalController = mock.MagicMock
+    sys.modules.setdefault(_controller_stub.__name__, _controller_stub)
+
+from powershell_mcp.powershell_server import MAX_CLIPBOARD_LENGTH, PROTOCOL_VERSION, PowerShellMCPServer  # noqa: E402
+
+
+class JsonRpcFramingTest(unittest.IsolatedAsyncioTestCase):
+    """Requests go through _process_and_write and the frames written to stdout are decoded"""
+
+    def setUp(self) -> None:
+        self.server = PowerShellMCPServer()
+        self.server.terminal_controller = mock.MagicMock()
+        self.frames: List[bytes] = []
+        self.server._write_stdout = self.frames.append
+
+    async def send(self, line: bytes) -> Any:
+        await self.server._process_and_write(line, len(self.frames) + 1)
+        self.assertEqual(len(self.frames), 1)
+        frame = self.frames.pop()
+        self.assertTrue(frame.endswith(b"\n"))
+        self.assertEqual(frame.count(b"\n"), 1)
+        return json.loads(frame)
+
+    async def request(self, request_id: Any, method: str, params: Any = None) -> Any:
+        request = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            request["params"] = params
+        return await self.send(json.dumps(request).encode())
+
+    def assertError(self, response: Any, request_id: Any, code: int) -> None:
+        self.assertEqual(response["jsonrpc"], "2.0")
+        self.assertEqual(response["id"], request_id)
+        self.assertNotIn("result", response)
+        self.assertEqual(response["error"]["code"], code)
+        self.assertIsInstance(response["error"]["message"], str)
+
+    async def test_initialize_with_int_and_string_ids(self) -> None:
+        for request_id in (7, "req-7"):
+            with self.subTest(request_id=request_id):
+                response = await self.request(request_id, "initialize", {})
+                self.assertEqual(response["jsonrpc"], "2.0")
+                self.assertEqual(response["id"], request_id)
+                self.assertNotIn("error", response)
+                self.assertEqual(response["result"]["protocolVersion"], PROTOCOL_VERSION)
+                self.assertEqual(response["result"]["capabilities"], {"tools": {}})
+                self.assertEqual(response["result"]["serverInfo"]["name"], "powershell-mcp-server")
+
+    async def test_tools_list_with_int_and_string_ids(self) -> None:
+        for request_id in (2, 'id "with" quotes'):
+            with self.subTest(request_id=request_id):
+                response = await self.request(request_id, "tools/list")
+                self.assertEqual(response["id"], request_id)
+                tools = response["result"]["tools"]
+                self.assertEqual(
+                    [tool["name"] for tool in tools], ["execute_pwsh_script", "get_clipboard", "capture_pwsh_response"]
+                )
+                for tool in tools:
+                    self.assertEqual(tool["inputSchema"]["type"], "object")
+
+    async def test_parse_error(self) -> None:
+        response = await self.send(b'{"jsonrpc": "2.0", "id": 3, "method": ')
+        self.assertError(response, 1, -32700)
+        self.assertEqual(response["error"]["message"], "Parse error")
+
+    async def test_request_with_escaped_lone_surrogate(self) -> None:
+        response = await self.send(b'{"jsonrpc": "2.0", "id": "half \\ud800", "method": "tools/list"}')
+        self.assertEqual(response["id"], "half \ud800")
+        self.assertIn("tools", response["result"])
+
+    async def test_unknown_method(self) -> None:
+        response = await self.request("abc", 'no/such"method')
+        self.assertError(response, "abc", -32601)
+        self.assertEqual(response["error"]["message"], 'Unknown method: no/such"method')
+
+    async def test_unknown_tool(self) -> None:
+        response = await self.request(4, "tools/call", {"name": "format_disk", "arguments": {}})
+        self.assertError(response, 4, -32601)
+        self.assertIn("format_disk", response["error"]["message"])
+
+    async def test_missing_tool_name(self) -> None:
+        response = await self.request(5, "tools/call", {"arguments": {}})
+        self.assertError(response, 5, -32602)
+
+    async def test_validation_errors(self) -> None:
+        cases = {
+            "missing script": ("execute_pwsh_script", {}),
+            "blank script": ("execute_pwsh_script", {"script": "   \n\t"}),
+            "script type": ("execute_pwsh_script", {"script": 42}),
+            "timeout minimum": ("execute_pwsh_script", {"script": "Get-Date", "timeout": 0}),
+            "timeout type": ("execute_pwsh_script", {"script": "Get-Date", "timeout": "30"}),
+            "image format": ("capture_pwsh_response", {"image_format": "gif"}),
+            "compress level": ("capture_pwsh_response", {"compress_level": 10}),
+        }
+        for label, (tool_name, arguments) in cases.items():
+            with self.subTest(label):
+                response = await self.request(label, "tools/call", {"name": tool_name, "arguments": arguments})
+                self.assertError(response, label, -32602)
+        self.server.terminal_controller.paste_content.assert_not_called()
+
+    async def test_tool_result_envelope(self) -> None:
+        with mock.patch("powershell_mcp.powershell_server.paste_text", return_value='line "one"\nline two'):
+            response = await self.request(9, "tools/call", {"name": "get_clipboard", "arguments": {}})
+
+        self.assertEqual(response["id"], 9)
+        content = response["result"]["content"]
+        self.assertEqual(len(content), 1)
+        self.assertEqual(content[0]["type"], "text")
+        result = json.loads(content[0]["text"])
+        self.assertTrue(result["success"])
+        self.assertEqual(result["content"], 'line "one"\nline two')
+        self.assertFalse(result["truncated"])
+
+    async def test_clipboard_with_unpaired_surrogate(self) -> None:
+        # Windows clipboards can hold unpaired UTF-16 surrogates; orjson refuses to encode them
+        with mock.patch("powershell_mcp.powershell_server.paste_text", return_value="emoji half \ud83d"):
+            response = await self.request(10, "tools/call", {"name": "get_clipboard", "arguments": {}})
+
+        self.assertNotIn("error", response)
+        result = json.loads(response["result"]["content"][0]["text"])
+        self.assertEqual(result["content"], "emoji half \ud83d")
+
+    async def test_clipboard_truncation(self) -> None:
+        clipboard = "x" * MAX_CLIPBOARD_LENGTH + "y"
+        with mock.patch("powershell_mcp.powershell_server.paste_text", return_value=clipboard):
+            response = await self.request(11, "tools/call", {"name": "get_clipboard", "arguments": {}})
+
+        result = json.loads(response["result"]["content"][0]["text"])
+        self.assertTrue(result["truncated"])
+        self.assertEqual(result["length"], MAX_CLIPBOARD_LENGTH + 1)
+        self.assertEqual(result["content"], clipboard[:MAX_CLIPBOARD_LENGTH])
+
+
+class ExecuteScriptTest(unittest.IsolatedAsyncioTestCase):
+    """Script analysis in execute_pwsh_script, with the terminal controller mocked out"""
+
+    def setUp(self) -> None:
+        self.server = PowerShellMCPServer()
+        self.server.terminal_controller = mock.MagicMock()
+        sleep_patcher = mock.patch("powershell_mcp.powershell_server.asyncio.sleep", new=mock.AsyncMock())
+        self.sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    async def test_only_newlines_separate_lines(self) -> None:
+        cases = {
+            "a\rb": 1,
+            "a\x0bb\x0cc": 1,
+            "a b\x85c": 1,
+            "a\r\nb": 2,
+            "a\n\n  \nb\n": 2,
+        }
+        for script, lines_count in cases.items():
+            with self.subTest(script=script):
+                result = await self.server.execute_pwsh_script(script)
+                self.assertEqual(result["lines_count"], lines_count)
+                self.assertEqual(result["is_multiline"], lines_count > 1)
+                self.server.terminal_controller.paste_content.assert_called_with(script, execute=True)
+
+
+if __name__ == "__main__":
+    unittest.main()